@@ -11,7 +11,6 @@
 """
 
 # internal modules
-from math import isnan
 
 
 # third party modules
@@ -41,23 +40,21 @@ def datafiltering(csvfilename: str, newfilename: str) -> pd.DataFrame:
             path to the csv file from simple_monthly_class.py
 
         newfilename: str
-            path to the new csv file after filtering
+            path to the new parquet file after filtering
     """
 
     # read the file
     df = pd.read_csv(csvfilename, index_col=0)
 
     # fill in all nan in the precipitation and snowfall columns by zeros
-    for col in df.columns:
-        for colnm in ['prec', 'sndp']:
-            if colnm in col:
-                df.loc[df[col].apply(isnan), col] = 0
+    mask_cols = df.columns.str.contains('prec|sndp', regex=True)
+    df.loc[:, mask_cols] = df.loc[:, mask_cols].fillna(0.0)
 
-    # drop all nan columns
-    df = df.dropna(0)
+    # drop all rows with nan
+    df = df.dropna(axis=0)
 
     # write to file and return the df
-    df.to_csv(newfilename)
+    df.to_parquet(newfilename, compression='zstd')
 
     return df
 
@@ -80,19 +77,37 @@ def read_history(histfilename: str) -> pd.DataFrame:
             END: end date in string
     """
 
-    # read file
-    df = pd.read_fwf(
-        histfilename, widths=[7, 6, 30, 5, 3, 5, 9, 9, 8, 9, 9],
-        header=0, skiprows=21, names=[
-            'USAF', 'WBAN', 'STN_NM', 'CTRY', 'ST', 'CALL', 'LAT', 'LON',
-            'ELEV', 'BEGIN', 'END'
-        ]
-    )
-    # combine string
-    df.loc[:, 'stn'] = [
-        ''.join(['%06i' % stn, ' ', '%05i' % wban])
-        for stn, wban in zip(df['USAF'], df['WBAN'])
+    # read file and keep the non-empty lines after the header
+    with open(histfilename, 'rb') as fopened:
+        lines = [line for line in fopened.read().splitlines()[22:] if line]
+    # view the lines as a 2D array of characters padded by null bytes and
+    # slice the fixed width columns from it
+    widths = [7, 6, 30, 5, 3, 5, 9, 9, 8, 9, 9]
+    names = [
+        'USAF', 'WBAN', 'STN_NM', 'CTRY', 'ST', 'CALL', 'LAT', 'LON',
+        'ELEV', 'BEGIN', 'END'
     ]
+    ends = np.cumsum(widths)
+    chars = np.array(lines, dtype='S%i' % ends[-1])
+    chars = chars.view('S1').reshape(len(lines), ends[-1])
+    cols = {
+        name: np.char.strip(np.ascontiguousarray(
+            chars[:, end-width:end]
+        ).view('S%i' % width).ravel().astype('U%i' % width))
+        for name, width, end in zip(names, widths, ends)
+    }
+    for col in ['USAF', 'WBAN', 'BEGIN', 'END']:
+        cols[col] = cols[col].astype(np.int64)
+    for col in ['LAT', 'LON', 'ELEV']:
+        cols[col] = np.where(cols[col] == '', 'nan', cols[col]).astype(float)
+    df = pd.DataFrame(cols)
+    for col in ['STN_NM', 'CTRY', 'ST', 'CALL']:
+        df.loc[df[col] == '', col] = np.nan
+    # the codes have few distinct values
+    df = df.astype({'CTRY': 'category', 'ST': 'category', 'CALL': 'category'})
+    # combine string
+    df['stn'] = df['USAF'].map('{:06d}'.format) + ' ' + \
+        df['WBAN'].map('{:05d}'.format)
     return df
 
 
@@ -113,31 +128,34 @@ def shift_data(filtereddf: pd.DataFrame, locdf: pd.DataFrame,
             location datafrane from read_history()
 
         filename: str
-            name of the file to be stored
+            name of the parquet file to be stored
     """
 
-    # merge the dataframe
-    overall_df = filtereddf.merge(locdf, how='inner', on='stn')
+    # find the data with latitude < 0 by looking up the station latitude.
+    # Only the first entry of a repeated station is used for the lookup
+    lat = locdf.drop_duplicates('stn').set_index('stn')['LAT']
+    south_ind = filtereddf['stn'].map(lat) < 0.0
+    shift_df = filtereddf.copy()
 
-    # find the data with latitude < 0
-    south_ind = overall_df['LAT'] < 0.0
-
-    # shift the series
+    # shift the series by swapping the first and last six months of all
+    # variables in one block
+    now_cols = []
+    fut_cols = []
     for ind in range(1, 7):
         for txt in ['tmp', 'dew', 'stp', 'wpd', 'prec', 'sndp']:
             for suffix in ['mean', 'max', 'min']:
-                now_mn = ''.join([txt, '%02i' % ind, suffix])
-                fut_mn = ''.join([txt, '%02i' % (ind+6), suffix])
-                temp_series = overall_df.loc[
-                    south_ind, now_mn
-                ]
-                overall_df.loc[south_ind, now_mn] = overall_df.loc[
-                    south_ind, fut_mn
-                ]
-                overall_df.loc[south_ind, fut_mn] = temp_series
+                now_cols.append(''.join([txt, '%02i' % ind, suffix]))
+                fut_cols.append(''.join([txt, '%02i' % (ind+6), suffix]))
+    now_block = shift_df.loc[south_ind, now_cols].to_numpy(copy=True)
+    shift_df.loc[south_ind, now_cols] = \
+        shift_df.loc[south_ind, fut_cols].to_numpy()
+    shift_df.loc[south_ind, fut_cols] = now_block
+
+    # merge the location info of the stations
+    overall_df = shift_df.merge(locdf, how='inner', on='stn')
 
     # save the data
-    overall_df.to_csv(filename)
+    overall_df.to_parquet(filename, compression='zstd')
     return overall_df
 
 
@@ -145,7 +163,7 @@ def shift_data(filtereddf: pd.DataFrame, locdf: pd.DataFrame,
 if __name__ == '__main__':
 
     FILTERED_DF = datafiltering(
-        '../results/gsod_2016_monthly.csv', '../results/gsod_filtered.csv'
+        '../results/gsod_2016_monthly.csv', '../results/gsod_filtered.parquet'
     )
 
     HISTORY_DF = read_history('../data/gsod/isd-history.txt')
@@ -153,7 +171,7 @@ if __name__ == '__main__':
     # check if the columns are switched
     OVERALL_DF_OLD = FILTERED_DF.merge(HISTORY_DF, how='inner', on='stn')
     OVERALL_DF_NEW = shift_data(
-        FILTERED_DF, HISTORY_DF, '../results/gsod_shift.csv'
+        FILTERED_DF, HISTORY_DF, '../results/gsod_shift.parquet'
     )
     SOUTH_IND = OVERALL_DF_OLD['LAT'] < 0.0
     assert (OVERALL_DF_OLD.loc[SOUTH_IND, 'tmp01mean'] == \
@@ -10,20 +10,23 @@
 """
 
 # internal modules
-from math import isnan
 from collections import namedtuple
+import re
 
 
 # third party modules
 import numpy as np
 import pandas as pd
-from scipy.cluster.vq import kmeans2
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
 
 
 # user-defined modules
 
 
 # global variables
+# number of data points above which MiniBatchKMeans is used
+MINIBATCH_THRESHOLD = 100000
 
 
 # user-defined classes
@@ -45,13 +48,13 @@ def kmeans_classify(filename: str, centroidfilename: str,
         Inputs:
         ==========
         filename: str
-            path to the csv file from data_filtering.py
+            path to the parquet file from data_filtering.py
 
         centroidfilename: str
-            path to the new csv file storing information of centroids
+            path to the new parquet file storing information of centroids
 
         classfilename: str
-            path to the new csv file storing information of classes
+            path to the new parquet file storing information of classes
 
         numclasses: int
             number of classes
@@ -66,28 +69,39 @@ def kmeans_classify(filename: str, centroidfilename: str,
     """
 
     # create x array
-    df = pd.read_csv(filename, index_col='stn')
-    df = df.drop('Unnamed: 0', axis=1)
-    cols = []
-    for col in df.columns:
-        for colnm in inclist:
-            if colnm in col:
-                cols.append(col)
+    df = pd.read_parquet(filename).set_index('stn')
+    cols = df.columns[df.columns.str.contains(
+        '|'.join(map(re.escape, inclist)), regex=True
+    )].tolist()
     newdf = df.loc[:, cols]
-    xarray = np.array(newdf)
+    xarray = newdf.to_numpy(dtype=np.float32, copy=True)
     if numdatapts is not None:
         xarray = xarray[:numdatapts, :]
+    xarray = np.ascontiguousarray(xarray)
+    # standardize the variables in place so that none of them dominates
+    # the distance
+    scaler = StandardScaler(copy=False)
+    xarray = scaler.fit_transform(xarray)
 
     # run k-means
-    centroids, classes = kmeans2(xarray, numclasses)
+    if xarray.shape[0] > MINIBATCH_THRESHOLD:
+        kmeans = MiniBatchKMeans(
+            n_clusters=numclasses, n_init=10, batch_size=4096
+        )
+    else:
+        kmeans = KMeans(n_clusters=numclasses, n_init=10, algorithm='elkan')
+    kmeans.fit(xarray)
+    centroids, classes = kmeans.cluster_centers_, kmeans.labels_
 
     # create new df
-    centroiddf = pd.DataFrame(centroids, columns=newdf.columns)
+    centroiddf = pd.DataFrame(
+        scaler.inverse_transform(centroids), columns=newdf.columns
+    )
     df.loc[df.index[0:len(classes)], 'classes'] = classes
 
     # save files
-    centroiddf.to_csv(centroidfilename)
-    df.to_csv(classfilename)
+    centroiddf.to_parquet(centroidfilename, compression='zstd')
+    df.to_parquet(classfilename, compression='zstd')
 
     return ResultTuple(centroiddf, df)
 
@@ -96,9 +110,9 @@ def kmeans_classify(filename: str, centroidfilename: str,
 if __name__ == '__main__':
 
     RESULTS = kmeans_classify(
-        '../results/gsod_shift.csv',
-        '../results/gsod_kmeans_centroids.csv',
-        '../results/gsod_kmeans_classes.csv',
+        '../results/gsod_shift.parquet',
+        '../results/gsod_kmeans_centroids.parquet',
+        '../results/gsod_kmeans_classes.parquet',
         19, inclist = ['tmp', 'dew', 'stp', 'wpd']
     )
     print(RESULTS.classes)
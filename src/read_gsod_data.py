@@ -11,12 +11,14 @@
 """
 
 # internal modules
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
 import gzip
-from os import remove
+import io
 import tarfile
+from typing import IO, Union
 
 # third party modules
+import numpy as np
 import pandas as pd
 
 # user-defined modules
@@ -29,12 +31,12 @@ import pandas as pd
 
 
 # user functions
-def read_gsod_file(filename: str) -> pd.DataFrame:
+def read_gsod_file(filename: Union[str, IO[bytes]]) -> pd.DataFrame:
     """
         This function reads a GSOD data file and return a pandas DataFrame
         with the following columns:
             stn: station number and wban in str
-            date: date value of the data point in datetime.date object
+            date: date value of the data point in datetime64
             tmp: mean temperature in K
             dew: mean dewpoint temperature in K
             stp: standard station pressure in Pa
@@ -50,75 +52,88 @@ def read_gsod_file(filename: str) -> pd.DataFrame:
 
         Inputs:
         ==========
-        gzfilename: str
-            path to op file containing the gsod file of a station
+        filename: str or file object
+            path to op file containing the gsod file of a station, or the
+            opened file
     """
 
-    # read the file first
+    # read the file first. The flagged columns are always read as strings
     raw_df = pd.read_csv(
-        filename, delim_whitespace=True, skiprows=1,
-        names=[ind for ind in range(22)]
+        filename, sep=r'\s+', skiprows=1, names=[ind for ind in range(22)],
+        dtype={17: str, 18: str, 19: str}
     )
 
-    # build new df
-    ori_df = pd.DataFrame(columns=[
-        'stn', 'date', 'tmp', 'dew', 'stp', 'wpd',
-        'count_tmp', 'count_dew', 'count_stp', 'count_wpd',
-        'max_tmp', 'min_tmp', 'prec', 'sndp'
-    ])
-
-    # assign columns
-    ori_df.loc[:, 'stn'] = [
+    # build the columns of the new df
+    cols = {}
+    cols['stn'] = [
         ''.join(['%06i' % stn, ' ', '%05i' % wban])
         for stn, wban in zip(raw_df[0], raw_df[1])
     ]
-    ori_df.loc[:, 'date'] = [
-        date(int(str(text)[0:4]), int(str(text)[4:6]), int(str(text)[6:8]))
-        for text in raw_df[2]
-    ]
-    ori_df.loc[:, 'yr'] = [int(str(text)[0:4]) for text in raw_df[2]]
-    ori_df.loc[:, 'mn'] = [int(str(text)[4:6]) for text in raw_df[2]]
-    ori_df.loc[:, 'dy'] = [int(str(text)[6:8]) for text in raw_df[2]]
-    ori_df.loc[:, 'tmp'] = (raw_df[3].replace(9999.9, float('nan'))-32.0)*5./9.
-    ori_df.loc[:, 'dew'] = (raw_df[5].replace(9999.9, float('nan'))-32.0)*5./9.
-    ori_df.loc[:, 'stp'] = raw_df[9].replace(9999.9, float('nan'))*100.0
-    ori_df.loc[:, 'wpd'] = raw_df[13].replace(999.9, float('nan')) * \
-        0.5144444444444
-    ori_df.loc[:, 'count_tmp'] = raw_df[4]
-    ori_df.loc[:, 'count_dew'] = raw_df[6]
-    ori_df.loc[:, 'count_stp'] = raw_df[10]
-    ori_df.loc[:, 'count_wpd'] = raw_df[14]
-    if isinstance(raw_df[17][0], str):
-        ori_df.loc[:, 'max_tmp'] = [
-            (float(ind.replace('*', ''))-32.0)*5./9.
-            if ind != '9999.9' else float('nan')
-            for ind in raw_df[17]
-        ]
-    else:
-        ori_df.loc[:, 'max_tmp'] = \
-            (raw_df[17].replace(9999.9, float('nan'))-32.0)*5./9.
-    if isinstance(raw_df[18][0], str):
-        ori_df.loc[:, 'min_tmp'] = [
-            (float(ind.replace('*', ''))-32.0)*5./9.
-            if ind != '9999.9' else float('nan')
-            for ind in raw_df[18]
-        ]
-    else:
-        ori_df.loc[:, 'min_tmp'] = \
-            (raw_df[18].replace(9999.9, float('nan'))-32.0)*5./9.
-    if isinstance(raw_df[19][0], str):
-        ori_df.loc[:, 'prec'] = [
-            float(ind[:-1])*25.4 if ind != '99.99' else float('nan')
-            for ind in raw_df[19]
-        ]
-    else:
-        ori_df.loc[:, 'prec'] = raw_df[19].replace(99.99, float('nan'))*25.4
+    date = pd.DatetimeIndex(pd.to_datetime(
+        raw_df[2].astype(str), format='%Y%m%d', cache=True
+    ))
+    cols['date'] = date.to_numpy()
+    tmp = raw_df[3].to_numpy()
+    cols['tmp'] = np.where(tmp == 9999.9, np.nan, (tmp-32.0)*5./9.)
+    dew = raw_df[5].to_numpy()
+    cols['dew'] = np.where(dew == 9999.9, np.nan, (dew-32.0)*5./9.)
+    stp = raw_df[9].to_numpy()
+    cols['stp'] = np.where(stp == 9999.9, np.nan, stp*100.0)
+    wpd = raw_df[13].to_numpy()
+    cols['wpd'] = np.where(wpd == 999.9, np.nan, wpd*0.5144444444444)
+    cols['count_tmp'] = raw_df[4].to_numpy()
+    cols['count_dew'] = raw_df[6].to_numpy()
+    cols['count_stp'] = raw_df[10].to_numpy()
+    cols['count_wpd'] = raw_df[14].to_numpy()
+    # strip the flags after the values before conversion
+    max_tmp = pd.to_numeric(
+        raw_df[17].str.rstrip('*'), errors='coerce'
+    ).to_numpy()
+    cols['max_tmp'] = np.where(
+        max_tmp == 9999.9, np.nan, (max_tmp-32.0)*5./9.
+    )
+    min_tmp = pd.to_numeric(
+        raw_df[18].str.rstrip('*'), errors='coerce'
+    ).to_numpy()
+    cols['min_tmp'] = np.where(
+        min_tmp == 9999.9, np.nan, (min_tmp-32.0)*5./9.
+    )
+    prec = pd.to_numeric(
+        raw_df[19].str.rstrip('ABCDEFGHI'), errors='coerce'
+    ).to_numpy()
+    cols['prec'] = np.where(prec == 99.99, np.nan, prec*25.4)
     # invalid values replaced by 0 snowfall
-    ori_df.loc[:, 'sndp'] = raw_df[20].replace(999.9, 0.0)*25.4
+    sndp = raw_df[20].to_numpy()
+    cols['sndp'] = np.where(sndp == 999.9, 0.0, sndp*25.4)
+    cols['yr'] = date.year.to_numpy()
+    cols['mn'] = date.month.to_numpy().astype('int8')
+    cols['dy'] = date.day.to_numpy()
+
+    # build new df in one go
+    ori_df = pd.DataFrame(cols, columns=[
+        'stn', 'date', 'tmp', 'dew', 'stp', 'wpd',
+        'count_tmp', 'count_dew', 'count_stp', 'count_wpd',
+        'max_tmp', 'min_tmp', 'prec', 'sndp', 'yr', 'mn', 'dy'
+    ])
 
     return ori_df
 
 
+def _read_gz_bytes(data: bytes) -> pd.DataFrame:
+    """
+        This function decompresses the bytes of a gzipped GSOD data file in
+        memory and return the pandas DataFrame from read_gsod_file()
+
+        Inputs:
+        ==========
+        data: bytes
+            content of the gz file of a station
+    """
+
+    with gzip.GzipFile(fileobj=io.BytesIO(data)) as fopened:
+        return read_gsod_file(fopened)
+
+
 def unzip_gsod_files(tarfilename: str, numfile: float=float('inf')) -> list:
     """
         This function reads the gsod files stored in the designated tar file
@@ -135,33 +150,33 @@ def unzip_gsod_files(tarfilename: str, numfile: float=float('inf')) -> list:
             all files will be read
     """
 
-    # create empty list
+    # create empty dict
     dfdict = {}
 
-    # read the fire directory in the zipped file
-    num = 0
-    with tarfile.open(tarfilename, 'r') as maintar:
-        total_files = min(
-            sum(1 for member in maintar if member.isreg()), numfile
-        )
-        print('Number of files to be read: ', total_files)
-        for maintarinfo in maintar:
-            # extract one file at a time. One file for one station.
-            # to reduce storage requirement
-            if '.gz' in maintarinfo.name:
-                maintar.extractall(members=[maintarinfo])
-                # now read the extracted file
-                with gzip.open(maintarinfo.name) as fopened:                    
-                    if num % 4 == 0:
-                        print('Reading ', maintarinfo.name, ' data')
-                        print('Stage: ', (num+1.0)/total_files)
-                    df = read_gsod_file(fopened)
-                    dfdict[df['stn'][0]] = df
-                    num += 1
-                # remove file
-                remove(maintarinfo.name)
-            if num > numfile:
-                break
+    # read the fire directory in the zipped file. The tar file is streamed
+    # in a single pass
+    with tarfile.open(tarfilename, 'r|') as maintar:
+        # one file for one station. The files are read into memory instead
+        # of being extracted to disk and are decompressed and parsed in
+        # separate threads
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {}
+            for maintarinfo in maintar:
+                if len(futures) >= numfile:
+                    break
+                if maintarinfo.name.endswith('.gz'):
+                    futures[executor.submit(
+                        _read_gz_bytes,
+                        maintar.extractfile(maintarinfo).read()
+                    )] = maintarinfo.name
+            print('Number of files to be read: ', len(futures))
+            # collect in the order of the tar file
+            for num, (future, name) in enumerate(futures.items()):
+                if num % 4 == 0:
+                    print('Reading ', name, ' data')
+                    print('Stage: ', (num+1.0)/len(futures))
+                df = future.result()
+                dfdict[df['stn'][0]] = df
 
     # return the dataframe
     return dfdict
@@ -12,6 +12,7 @@
 """
 
 # internal modules
+from concurrent.futures import ProcessPoolExecutor
 
 
 # third party modules
@@ -30,6 +31,28 @@ from read_gsod_data import unzip_gsod_files
 
 
 # user functions
+def _station_row(df: pd.DataFrame) -> np.ndarray:
+    """
+        This function calculates the mean, max and min of temperature,
+        dewpoint, pressure, wind speed, precipitation and snowfall of each
+        month of a station and returns them as a float32 numpy array for
+        one row of the final DataFrame, ordered by month, variable and
+        statistic
+
+        Inputs:
+        ==========
+        df: pandas DataFrame
+            data of the station from read_gsod_file()
+    """
+
+    # monthly statistics of all variables in one pass. Months without
+    # data are kept as nan
+    monthly = df.groupby('mn')[
+        ['tmp', 'dew', 'stp', 'wpd', 'prec', 'sndp']
+    ].agg(['mean', 'max', 'min']).reindex(range(1, 13))
+    return monthly.to_numpy(dtype=np.float32).ravel()
+
+
 def processing_monthly_data(tarfilename: str,
                             numfile: float=float('inf')) -> pd.DataFrame:
     """
@@ -51,29 +74,28 @@ def processing_monthly_data(tarfilename: str,
     dfsdict = unzip_gsod_files(tarfilename, numfile)
 
     # calculate the required columns
-    colnames = ['stn']
+    colnames = []
     for ind in range(1, 13):
         for txt in ['tmp', 'dew', 'stp', 'wpd', 'prec', 'sndp']:
             for cal in ['mean', 'max', 'min']:
                 colnames += [''.join([txt, '%02i' % ind, cal])]
-    total_files = len(dfsdict)
-    finaldf = pd.DataFrame(index=np.arange(total_files), columns=colnames)
-
-    # calculate the values
-    for fileind, stn in enumerate(dfsdict):
-        finaldf.loc[fileind, 'stn'] = stn
-        df = dfsdict[stn]
-        if fileind % 4 == 0:
-            print('Processing station ', stn, ' data')
-            print('Stage: ', (fileind+1.0)/total_files)
-        for ind in range(1, 13):
-            for txt in ['tmp', 'dew', 'stp', 'wpd', 'prec', 'sndp']:
-                finaldf.loc[fileind, ''.join([txt, '%02i' % ind, 'mean'])] = \
-                    df.loc[df['mn'] == ind, txt].mean()
-                finaldf.loc[fileind, ''.join([txt, '%02i' % ind, 'max'])] = \
-                    df.loc[df['mn'] == ind, txt].max()
-                finaldf.loc[fileind, ''.join([txt, '%02i' % ind, 'min'])] = \
-                    df.loc[df['mn'] == ind, txt].min()
+    print('Number of stations to be processed: ', len(dfsdict))
+
+    # calculate the values, one row per station. Stations are independent
+    # and are processed in parallel. The values are stored in a float32
+    # array in column-major order so that each column is contiguous
+    values = np.empty(
+        (len(dfsdict), len(colnames)), dtype=np.float32, order='F'
+    )
+    with ProcessPoolExecutor() as executor:
+        for fileind, row in enumerate(executor.map(
+                _station_row, dfsdict.values(), chunksize=32
+        )):
+            values[fileind, :] = row
+
+    # build the dataframe once
+    finaldf = pd.DataFrame(values, columns=colnames)
+    finaldf.insert(0, 'stn', list(dfsdict))
 
     return finaldf
 